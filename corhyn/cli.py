@@ -1,81 +1,371 @@
 import typer
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import atexit
+from contextlib import contextmanager
+from functools import lru_cache
 import sqlite3
-import json
 from pathlib import Path
-import os
-from .pomodoro import PomodoroTimer
-import csv
 
-app = typer.Typer(help="Corhyn - Your Personal Task Management CLI")
-console = Console(force_terminal=True, color_system="auto")
+if TYPE_CHECKING:
+    from rich.console import Console
 
-# Database setup
-DB_PATH = Path.home() / ".corhyn" / "tasks.db"
-DB_PATH.parent.mkdir(exist_ok=True)
+app = typer.Typer(help="Corhyn - Your Personal Task Management CLI", rich_markup_mode=None)
 
-def init_db():
-    """Initialize the SQLite database."""
-    conn = sqlite3.connect(str(DB_PATH))
-    c = conn.cursor()
+_CONSOLE: Optional["Console"] = None
 
-    # Create tasks table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            priority TEXT,
-            deadline TEXT,
-            status TEXT DEFAULT 'pending',
-            created_at TEXT NOT NULL
-        )
-    ''')
+def _console() -> "Console":
+    """Return the shared Rich console, creating it on first use."""
+    global _CONSOLE
+    if _CONSOLE is None:
+        from rich.console import Console
+        _CONSOLE = Console(force_terminal=True, color_system="auto")
+    return _CONSOLE
 
-    # Create time_entries table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS time_entries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER NOT NULL,
-            start_time TEXT NOT NULL,
-            duration INTEGER,
-            notes TEXT,
-            FOREIGN KEY (task_id) REFERENCES tasks (id)
-        )
-    ''')
-
-    # Create tags table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS tags (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            color TEXT,
-            created_at TEXT NOT NULL
-        )
-    ''')
+# Database setup
+_CONN: Optional[sqlite3.Connection] = None
+
+# RETURNING clauses need SQLite 3.35 or newer
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Tag ids already resolved by name during this process
+_tag_id_cache: Dict[str, int] = {}
+
+_VALID_PRIORITIES = frozenset(("low", "medium", "high"))
+_VALID_STATUSES = frozenset(("pending", "completed"))
+_PRIORITY_STYLE = {"high": "red", "medium": "yellow", "low": "green"}
+# Rich markup for each known priority and status, built once rather than per row
+_PRIORITY_TEXT = {name: f"[{style}]{name}[/{style}]" for name, style in _PRIORITY_STYLE.items()}
+_PRIORITY_TEXT[None] = "[dim]N/A[/dim]"
+_STATUS_TEXT = {"completed": "[green]completed[/green]", "pending": "[yellow]pending[/yellow]"}
+
+# Current time as integer UNIX epoch seconds, the form every timestamp
+# column is stored in, computed by SQLite so writes don't touch datetime
+_SQL_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+# Current local date as "YYYY-MM-DD", stored with each time entry
+_SQL_TODAY = "date('now', 'localtime')"
+# Start of each stats/report period as an epoch expression: the local
+# calendar boundary (weeks start on Monday) converted back to UTC
+_PERIOD_START_SQL = {
+    period: f"CAST(strftime('%s', 'now', 'localtime', {modifiers}, 'utc') AS INTEGER)"
+    for period, modifiers in (
+        ("day", "'start of day'"),
+        ("week", "'start of day', '-6 days', 'weekday 1'"),
+        ("month", "'start of month'"),
+        ("year", "'start of year'"),
+    )
+}
+# An epoch column as local "YYYY-MM-DD HH:MM" text, formatted by SQLite so
+# the render loops print strings instead of building a datetime per row
+_SQL_LOCAL_MINUTE = "strftime('%Y-%m-%d %H:%M', {}, 'unixepoch', 'localtime')"
+
+# Statements shared across commands, kept as constants so every caller
+# hits the same entry in the connection's statement cache
+_SQL_INSERT_TASK = f"""
+    INSERT INTO tasks (title, description, priority, deadline, created_at)
+    VALUES (?, ?, ?, ?, {_SQL_NOW})
+"""
+# Linking a task to a tag it already has is a no-op rather than an error
+_SQL_LINK_TAG = "INSERT OR IGNORE INTO task_tags (task_id, tag_id) VALUES (?, ?)"
+_SQL_TASK_TITLE = "SELECT id, title FROM tasks WHERE id = ?"
+_SQL_TAG_NAME = "SELECT name FROM tags WHERE id = ?"
+_SQL_OPEN_ENTRY = """
+    SELECT id FROM time_entries
+    WHERE end_time IS NULL
+    ORDER BY start_time DESC
+    LIMIT 1
+"""
+_SQL_STOP_ENTRY = f"""
+    UPDATE time_entries
+    SET end_time = {_SQL_NOW},
+        duration = {_SQL_NOW} - start_time
+"""
+# Closes the newest open entry and reports its duration in one statement
+_SQL_STOP_OPEN_ENTRY = f"{_SQL_STOP_ENTRY} WHERE id = ({_SQL_OPEN_ENTRY}) RETURNING duration"
+
+def _get_conn() -> sqlite3.Connection:
+    """Return the process-wide database connection, opening it on first use."""
+    global _CONN
+    if _CONN is None:
+        # Resolved here rather than at import so --help never touches disk
+        db_path = Path.home() / ".corhyn" / "tasks.db"
+        db_path.parent.mkdir(exist_ok=True)
+        # Autocommit mode: writes are grouped explicitly with _tx below
+        _CONN = sqlite3.connect(str(db_path), isolation_level=None, check_same_thread=False, cached_statements=256)
+        _CONN.row_factory = sqlite3.Row
+        _CONN.execute("PRAGMA journal_mode=WAL")
+        _CONN.execute("PRAGMA synchronous=NORMAL")
+        _CONN.execute("PRAGMA temp_store=MEMORY")
+        _CONN.execute("PRAGMA cache_size=-64000")
+        _CONN.execute("PRAGMA mmap_size=134217728")
+        # A write from another shell makes SQLite wait rather than fail at once
+        _CONN.execute("PRAGMA busy_timeout=5000")
+        # Migrations rebuild tables, which must not cascade or trip
+        # constraints, so foreign keys are only enforced once they're done
+        init_db(_CONN)
+        _CONN.execute("PRAGMA foreign_keys=ON")
+        atexit.register(_close_conn)
+    return _CONN
+
+@contextmanager
+def _tx(conn: sqlite3.Connection):
+    """Run the enclosed writes as one transaction, taking the write lock up front."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def _close_conn():
+    """Refresh the planner statistics SQLite asks for, then close the connection."""
+    global _CONN
+    if _CONN is not None:
+        try:
+            _CONN.execute("PRAGMA optimize")
+        finally:
+            _CONN.close()
+            _CONN = None
+
+# Full-text index over task titles for search, stored as an external-content
+# FTS5 table over tasks and kept in step with it by triggers. The trigram
+# tokenizer (SQLite 3.34+) matches any substring, like the LIKE search it
+# speeds up, rather than only whole words or word prefixes
+_FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE tasks_fts USING fts5(title, content='tasks', content_rowid='id', tokenize='trigram');
+
+    CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title);
+    END;
+    CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END;
+    CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO tasks_fts (rowid, title) VALUES (new.id, new.title);
+    END;
+
+    INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild');
+"""
+
+# Schema migrations, applied in order. PRAGMA user_version records how
+# many of them a database has run, so an up-to-date database skips the DDL.
+_MIGRATIONS = [
+    # 1: base schema
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        priority TEXT,
+        deadline TEXT,
+        status TEXT DEFAULT 'pending',
+        created_at TEXT NOT NULL,
+        completed_at TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS time_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        start_time TEXT NOT NULL,
+        end_time TEXT,
+        duration INTEGER,
+        notes TEXT,
+        FOREIGN KEY (task_id) REFERENCES tasks (id)
+    );
+
+    CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        color TEXT,
+        created_at TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS task_tags (
+        task_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        PRIMARY KEY (task_id, tag_id),
+        FOREIGN KEY (task_id) REFERENCES tasks (id),
+        FOREIGN KEY (tag_id) REFERENCES tags (id)
+    );
+
+    -- Indexes for the list/stop/stats/tags query paths
+    CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+    CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+    CREATE INDEX IF NOT EXISTS idx_tasks_status_priority ON tasks(status, priority);
+    CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_tasks_list_cover
+        ON tasks(status, created_at DESC, id, title, priority, deadline);
+    CREATE INDEX IF NOT EXISTS idx_time_entries_open
+        ON time_entries(start_time DESC) WHERE end_time IS NULL;
+    CREATE INDEX IF NOT EXISTS idx_time_entries_task ON time_entries(task_id);
+    CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag_id);
+    """,
+    # 2: task_tags as a WITHOUT ROWID join table whose links follow their
+    # task or tag on delete (orphaned links are dropped while copying)
+    """
+    CREATE TABLE task_tags_new (
+        task_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        PRIMARY KEY (task_id, tag_id),
+        FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE,
+        FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    INSERT INTO task_tags_new (task_id, tag_id)
+    SELECT task_id, tag_id FROM task_tags
+    WHERE task_id IN (SELECT id FROM tasks) AND tag_id IN (SELECT id FROM tags);
+
+    DROP TABLE task_tags;
+    ALTER TABLE task_tags_new RENAME TO task_tags;
+    CREATE INDEX idx_task_tags_tag ON task_tags(tag_id);
+    """,
+    # 3: status lookups are served by the leading column of the
+    # (status, created_at, ...) and (status, priority) indexes
+    """
+    DROP INDEX IF EXISTS idx_tasks_status;
+    """,
+    # 4: stats filters tasks on created_at and aggregates status and
+    # priority, so carry both in the created_at index to avoid table lookups
+    """
+    DROP INDEX IF EXISTS idx_tasks_created_at;
+    CREATE INDEX idx_tasks_created_cover ON tasks(created_at, status, priority);
+    """,
+    # 5: timestamps as INTEGER UNIX epoch seconds instead of local ISO-8601
+    # text; the tables are rebuilt because a TEXT column would turn the
+    # integers back into strings. Time entries of deleted tasks are dropped
+    # while copying, sequences are carried over so deleted ids aren't handed
+    # out again, and the list index breaks same-second ties by id.
+    """
+    CREATE TABLE tasks_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        priority TEXT,
+        deadline TEXT,
+        status TEXT DEFAULT 'pending',
+        created_at INTEGER NOT NULL,
+        completed_at INTEGER
+    );
+    INSERT INTO tasks_new
+    SELECT id, title, description, priority, deadline, status,
+        CAST(strftime('%s', created_at, 'utc') AS INTEGER),
+        CAST(strftime('%s', completed_at, 'utc') AS INTEGER)
+    FROM tasks;
+
+    CREATE TABLE time_entries_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        start_time INTEGER NOT NULL,
+        end_time INTEGER,
+        duration INTEGER,
+        notes TEXT,
+        FOREIGN KEY (task_id) REFERENCES tasks (id)
+    );
+    INSERT INTO time_entries_new
+    SELECT id, task_id,
+        CAST(strftime('%s', start_time, 'utc') AS INTEGER),
+        CAST(strftime('%s', end_time, 'utc') AS INTEGER),
+        duration, notes
+    FROM time_entries
+    WHERE task_id IN (SELECT id FROM tasks);
+
+    CREATE TABLE tags_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        color TEXT,
+        created_at INTEGER NOT NULL
+    );
+    INSERT INTO tags_new
+    SELECT id, name, color, CAST(strftime('%s', created_at, 'utc') AS INTEGER)
+    FROM tags;
+
+    DELETE FROM sqlite_sequence WHERE name IN ('tasks_new', 'time_entries_new', 'tags_new');
+    UPDATE sqlite_sequence SET name = name || '_new' WHERE name IN ('tasks', 'time_entries', 'tags');
+
+    DROP TABLE tasks;
+    DROP TABLE time_entries;
+    DROP TABLE tags;
+    ALTER TABLE tasks_new RENAME TO tasks;
+    ALTER TABLE time_entries_new RENAME TO time_entries;
+    ALTER TABLE tags_new RENAME TO tags;
+
+    CREATE INDEX idx_tasks_priority ON tasks(priority);
+    CREATE INDEX idx_tasks_status_priority ON tasks(status, priority);
+    CREATE INDEX idx_tasks_created_cover ON tasks(created_at, status, priority);
+    CREATE INDEX idx_tasks_list_cover
+        ON tasks(status, created_at DESC, id DESC, title, priority, deadline);
+    CREATE INDEX idx_time_entries_open
+        ON time_entries(start_time DESC) WHERE end_time IS NULL;
+    CREATE INDEX idx_time_entries_task ON time_entries(task_id);
+    """,
+    # 6: stats and the time report filter entries on start_time; ANALYZE
+    # gives the planner row counts to choose between the new indexes
+    """
+    CREATE INDEX idx_time_entries_start ON time_entries(start_time);
+    ANALYZE;
+    """,
+    # 7: the period aggregations in stats and the report read task_id and
+    # duration for each entry in range, so carry both in the start_time index
+    """
+    DROP INDEX IF EXISTS idx_time_entries_start;
+    CREATE INDEX idx_time_entries_start_cover ON time_entries(start_time, task_id, duration);
+    ANALYZE;
+    """,
+    # 8: full-text search over titles by trigram (skipped when SQLite can't build it)
+    _FTS_SCHEMA,
+    # 9: each entry's local start date, written on insert because a
+    # generated column can't use 'localtime', so the daily report groups
+    # straight off an index instead of converting every start_time
+    """
+    ALTER TABLE time_entries ADD COLUMN start_date TEXT;
+    UPDATE time_entries SET start_date = date(start_time, 'unixepoch', 'localtime');
+    CREATE INDEX idx_time_entries_date ON time_entries(start_date, duration);
+    ANALYZE;
+    """,
+    # 10: per-task time lookups range over start_time and sum duration, so
+    # extend the task_id index to cover them; ANALYZE lets the planner pick
+    # between it and the start_time index by selectivity
+    """
+    DROP INDEX IF EXISTS idx_time_entries_task;
+    CREATE INDEX idx_time_entries_task_time ON time_entries(task_id, start_time, duration);
+    ANALYZE;
+    """,
+]
+
+# Columns missing from databases created before the schema was versioned,
+# with the statement that backfills them
+_LEGACY_COLUMNS = [
+    ("tasks", "completed_at", "TEXT", ""),
+    # Entries that already have a duration were added manually and are closed
+    ("time_entries", "end_time", "TEXT",
+     "UPDATE time_entries SET end_time = start_time WHERE duration IS NOT NULL;"),
+]
+
+def init_db(conn: sqlite3.Connection):
+    """Create the database schema, or bring an older one up to date."""
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version >= len(_MIGRATIONS):
+        return
 
-    # Create task_tags relationship table
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS task_tags (
-            task_id INTEGER NOT NULL,
-            tag_id INTEGER NOT NULL,
-            PRIMARY KEY (task_id, tag_id),
-            FOREIGN KEY (task_id) REFERENCES tasks (id),
-            FOREIGN KEY (tag_id) REFERENCES tags (id)
-        )
-    ''')
+    script = ""
+    if version == 0:
+        for table, column, definition, backfill in _LEGACY_COLUMNS:
+            columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if columns and column not in columns:
+                script += f"ALTER TABLE {table} ADD COLUMN {column} {definition};\n{backfill}\n"
 
-    conn.commit()
-    conn.close()
+    for target, migration in enumerate(_MIGRATIONS[version:], start=version + 1):
+        if migration is _FTS_SCHEMA and not (
+            sqlite3.sqlite_version_info >= (3, 34, 0)
+            and conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0]
+        ):
+            # Search falls back to LIKE when there is no tasks_fts table
+            migration = ""
+        script += f"{migration}\nPRAGMA user_version = {target};\n"
 
-@app.callback()
-def main_callback():
-    """Initialize the database before any command."""
-    init_db()
+    conn.executescript(f"BEGIN;\n{script}COMMIT;")
 
 @app.command()
 def add(
@@ -86,198 +376,255 @@ def add(
     tags: Optional[str] = typer.Option(None, "--tags", "-t")
 ):
     """Add a new task to your list."""
-    if priority and priority not in ["low", "medium", "high"]:
-        console.print("[red]Priority must be one of: low, medium, high[/red]")
+    if priority and priority not in _VALID_PRIORITIES:
+        _console().print("[red]Priority must be one of: low, medium, high[/red]")
         return
 
-    conn = sqlite3.connect(str(DB_PATH))
-    c = conn.cursor()
+    try:
+        _validate_deadline(deadline)
+    except ValueError:
+        _console().print("[red]Deadline must be an ISO date, e.g. 2024-03-20[/red]")
+        return
 
-    # Insert task
-    c.execute('''
-        INSERT INTO tasks (title, description, priority, deadline, created_at)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (title, description, priority, deadline, datetime.now().isoformat()))
+    conn = _get_conn()
+    c = conn.cursor()
 
-    task_id = c.lastrowid
+    with _tx(conn):
+        # Insert task
+        c.execute(_SQL_INSERT_TASK, (title, description, priority, deadline))
 
-    # Handle tags
-    if tags:
-        tag_ids = _get_or_create_tags(c, tags)
-        for tag_id in tag_ids:
-            c.execute('''
-                INSERT INTO task_tags (task_id, tag_id)
-                VALUES (?, ?)
-            ''', (task_id, tag_id))
+        task_id = c.lastrowid
 
-    conn.commit()
-    conn.close()
+        # Handle tags
+        if tags:
+            tag_ids = _get_or_create_tags(c, tags)
+            c.executemany(_SQL_LINK_TAG, [(task_id, tag_id) for tag_id in tag_ids])
 
-    console.print(Panel(f"[green]Task added successfully: {title}[/green]"))
+    _console().print(f"[green]Task added successfully: {title}[/green]")
 
 @app.command()
-def list(
-    status: Optional[str] = typer.Option(None, "--status", "-s", help="Filter by status (pending/completed)"),
-    priority: Optional[str] = typer.Option(None, "--priority", "-p", help="Filter by priority (low/medium/high)"),
-    tags: Optional[str] = typer.Option(None, "--tags", "-t", help="Filter by tags (comma-separated)"),
-    show_completed: bool = typer.Option(False, "--show-completed", help="Show completed tasks")
+def bulk_add(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="File with one task per line")
 ):
-    """List all tasks with optional filtering."""
-    if status and status not in ["pending", "completed"]:
-        console.print("[red]Status must be one of: pending, completed[/red]")
+    """Add many tasks at once from a file.
+
+    Each non-empty line is either a plain task title or a JSON object with
+    "title" and optional "description", "priority", "deadline" and "tags".
+    """
+    import json
+    from collections.abc import Sequence
+
+    rows = []
+    row_tags = []
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except UnicodeDecodeError as e:
+        _console().print(f"[red]{path} is not UTF-8 text ({e.reason} at byte {e.start})[/red]")
         return
 
-    if priority and priority not in ["low", "medium", "high"]:
-        console.print("[red]Priority must be one of: low, medium, high[/red]")
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith("{"):
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                _console().print(f"[red]Line {line_no}: invalid JSON ({e})[/red]")
+                return
+        else:
+            entry = {"title": line}
+
+        title = entry.get("title")
+        description = entry.get("description")
+        # An empty priority or deadline means none was given
+        priority = entry.get("priority")
+        if priority == "":
+            priority = None
+        if not title or not isinstance(title, str):
+            _console().print(f"[red]Line {line_no}: a task title is required[/red]")
+            return
+        if not isinstance(description, (str, type(None))):
+            _console().print(f"[red]Line {line_no}: description must be a string[/red]")
+            return
+        if priority is not None and (not isinstance(priority, str) or priority not in _VALID_PRIORITIES):
+            _console().print(f"[red]Line {line_no}: priority must be one of: low, medium, high[/red]")
+            return
+        deadline = entry.get("deadline")
+        if deadline == "":
+            deadline = None
+        try:
+            if not isinstance(deadline, (str, type(None))):
+                raise TypeError(deadline)
+            _validate_deadline(deadline)
+        except (TypeError, ValueError):
+            _console().print(f"[red]Line {line_no}: deadline must be an ISO date, e.g. 2024-03-20[/red]")
+            return
+
+        # Tags may be given as a comma-separated string or a JSON array
+        # (`list` is the command below, so arrays are matched as Sequence)
+        tags = entry.get("tags")
+        if isinstance(tags, Sequence) and not isinstance(tags, str) and all(isinstance(tag, str) for tag in tags):
+            tags = ",".join(tags)
+        elif not isinstance(tags, (str, type(None))):
+            _console().print(f"[red]Line {line_no}: tags must be a string or a list of strings[/red]")
+            return
+
+        rows.append((title, description, priority, deadline))
+        row_tags.append(tags)
+
+    if not rows:
+        _console().print("[yellow]No tasks found in the file.[/yellow]")
         return
 
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     c = conn.cursor()
 
-    query = """
-        SELECT DISTINCT t.*, GROUP_CONCAT(tg.name) as tag_names
-        FROM tasks t
-        LEFT JOIN task_tags tt ON t.id = tt.task_id
-        LEFT JOIN tags tg ON tt.tag_id = tg.id
+    # Insert every task in one transaction
+    with _tx(conn):
+        if not any(row_tags):
+            c.executemany(_SQL_INSERT_TASK, rows)
+        else:
+            # Tagged tasks are inserted one at a time so each link uses the
+            # id SQLite just assigned
+            links = []
+            for row, tags in zip(rows, row_tags):
+                c.execute(_SQL_INSERT_TASK, row)
+                task_id = c.lastrowid
+                if tags:
+                    links.extend((task_id, tag_id) for tag_id in _get_or_create_tags(c, tags))
+            c.executemany(_SQL_LINK_TAG, links)
+
+    count = len(rows)
+    _console().print(f"[green]Added {count} task{'s' if count != 1 else ''} from {path}[/green]")
+
+@lru_cache(maxsize=None)
+def _list_queries(by_status: bool, by_priority: bool, by_tags: bool) -> Tuple[str, str]:
+    """Return the tag and task queries for one combination of list filters.
+
+    A given combination always produces the same SQL text, so repeated
+    calls hit the prepared statements in the connection's cache.
     """
-    params = []
-
     conditions = []
-    if not show_completed:
-        conditions.append("t.status = 'pending'")
-    if status:
+    if by_status:
         conditions.append("t.status = ?")
-        params.append(status)
-    if priority:
+    if by_priority:
         conditions.append("t.priority = ?")
-        params.append(priority)
-    if tags:
-        tag_list = [tag.strip() for tag in tags.split(',')]
-        placeholders = ','.join(['?'] * len(tag_list))
-        conditions.append(f"""
-            t.id IN (
-                SELECT task_id
-                FROM task_tags tt
+    if by_tags:
+        # The tag names arrive as one JSON array, so the SQL is the same for
+        # any number of tags: keep tasks for which no requested tag is
+        # missing, each tag being an indexed probe that stops at the first hit
+        conditions.append("""NOT EXISTS (
+            SELECT 1 FROM json_each(?) wanted
+            WHERE NOT EXISTS (
+                SELECT 1 FROM task_tags tt
                 JOIN tags tg ON tt.tag_id = tg.id
-                WHERE tg.name IN ({placeholders})
-                GROUP BY task_id
-                HAVING COUNT(DISTINCT tg.name) = ?
+                WHERE tt.task_id = t.id AND tg.name = wanted.value
             )
-        """)
-        params.extend(tag_list)
-        params.append(len(tag_list))
+        )""")
 
+    source = "FROM tasks t"
     if conditions:
-        query += " WHERE " + " AND ".join(conditions)
+        source += " WHERE " + " AND ".join(conditions)
 
-    query += " GROUP BY t.id ORDER BY t.created_at DESC"
+    tags_query = f"""
+        SELECT tt.task_id, tg.name
+        FROM task_tags tt
+        JOIN tags tg ON tt.tag_id = tg.id
+        WHERE tt.task_id IN (SELECT t.id {source})
+    """
+    tasks_query = f"""
+        SELECT t.id, t.title, t.priority, t.deadline, t.status,
+            {_SQL_LOCAL_MINUTE.format("t.created_at")} AS created
+        {source}
+        ORDER BY t.created_at DESC, t.id DESC
+    """
+    return tags_query, tasks_query
 
-    c.execute(query, params)
-    tasks = c.fetchall()
+@app.command()
+def list(
+    status: Optional[str] = typer.Option(None, "--status", "-s", help="Filter by status (pending/completed)"),
+    priority: Optional[str] = typer.Option(None, "--priority", "-p", help="Filter by priority (low/medium/high)"),
+    tags: Optional[str] = typer.Option(None, "--tags", "-t", help="Filter by tags (comma-separated)"),
+    show_completed: bool = typer.Option(False, "--show-completed", help="Show completed tasks")
+):
+    """List all tasks with optional filtering."""
+    if status and status not in _VALID_STATUSES:
+        _console().print("[red]Status must be one of: pending, completed[/red]")
+        return
 
-    if not tasks:
-        console.print("[yellow]No tasks found matching the criteria.[/yellow]")
+    if priority and priority not in _VALID_PRIORITIES:
+        _console().print("[red]Priority must be one of: low, medium, high[/red]")
         return
 
-    table = Table(show_header=True, header_style="bold magenta")
-    table.add_column("ID", style="dim")
-    table.add_column("Title")
-    table.add_column("Priority", justify="center")
-    table.add_column("Deadline", justify="center")
-    table.add_column("Status", justify="center")
-    table.add_column("Tags")
-    table.add_column("Created", justify="center")
+    conn = _get_conn()
+    c = conn.cursor()
 
-    for task in tasks:
-        # Format the status with color
-        status_style = "green" if task[5] == "completed" else "yellow"
-        status_text = f"[{status_style}]{task[5]}[/{status_style}]"
-
-        # Format the priority with color
-        priority_style = {
-            "high": "red",
-            "medium": "yellow",
-            "low": "green"
-        }.get(task[3], "dim")
-        priority_text = f"[{priority_style}]{task[3] or 'N/A'}[/{priority_style}]"
-
-        # Format the creation date
-        created_at = datetime.fromisoformat(task[6])
-        created_text = created_at.strftime("%Y-%m-%d %H:%M")
-
-        # Safely access tag_names
-        tag_names = task[8] if len(task) > 8 and task[8] else ""
-        tag_text = ", ".join(f"[blue]{tag}[/blue]" for tag in tag_names.split(',') if tag)
-
-        table.add_row(
-            str(task[0]),
-            task[1],
-            priority_text,
-            task[4] or "N/A",
-            status_text,
-            tag_text,
-            created_text
-        )
+    # An explicit --status wins; otherwise hide completed tasks by default
+    status = status or (None if show_completed else "pending")
+    tag_names = [name for name in dict.fromkeys(tag.strip() for tag in tags.split(',')) if name] if tags else []
+    params = [value for value in (status, priority) if value]
+    if tag_names:
+        import json
+        params.append(json.dumps(tag_names))
+
+    tags_query, tasks_query = _list_queries(bool(status), bool(priority), bool(tag_names))
 
-    console.print(table)
-    conn.close()
+    # Fetch the tags of the matching tasks first, so the task rows
+    # themselves can be streamed straight into the table below
+    c.execute(tags_query, params)
+    tags_by_task = {}
+    for task_id, name in c:
+        tags_by_task.setdefault(task_id, []).append(name)
+
+    c.execute(tasks_query, params)
+
+    if not _print_tasks(c, tags_by_task):
+        _console().print("[yellow]No tasks found matching the criteria.[/yellow]")
 
 @app.command()
 def start(task_id: int):
     """Start time tracking for a task."""
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     c = conn.cursor()
 
-    # Check if task exists
-    c.execute("SELECT id FROM tasks WHERE id = ?", (task_id,))
-    if not c.fetchone():
-        console.print(f"[red]Task with ID {task_id} not found![/red]")
+    # Start time tracking; the foreign key on task_id rejects unknown tasks
+    try:
+        with _tx(conn):
+            c.execute(f'''
+                INSERT INTO time_entries (task_id, start_time, start_date)
+                VALUES (?, {_SQL_NOW}, {_SQL_TODAY})
+            ''', (task_id,))
+    except sqlite3.IntegrityError:
+        _console().print(f"[red]Task with ID {task_id} not found![/red]")
         return
 
-    # Start time tracking
-    c.execute('''
-        INSERT INTO time_entries (task_id, start_time)
-        VALUES (?, ?)
-    ''', (task_id, datetime.now().isoformat()))
-
-    conn.commit()
-    conn.close()
-
-    console.print(f"[green]Started time tracking for task {task_id}[/green]")
+    _console().print(f"[green]Started time tracking for task {task_id}[/green]")
 
 @app.command()
 def stop():
     """Stop time tracking for the current task."""
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     c = conn.cursor()
 
-    # Get the latest time entry
-    c.execute('''
-        SELECT id, task_id, start_time FROM time_entries
-        WHERE end_time IS NULL
-        ORDER BY start_time DESC
-        LIMIT 1
-    ''')
+    with _tx(conn):
+        if _HAS_RETURNING:
+            c.execute(_SQL_STOP_OPEN_ENTRY)
+            entry = c.fetchone()
+        else:
+            # Get the latest time entry, close it, then read its duration back
+            entry = c.execute(_SQL_OPEN_ENTRY).fetchone()
+            if entry:
+                c.execute(f"{_SQL_STOP_ENTRY} WHERE id = ?", (entry["id"],))
+                entry = c.execute("SELECT duration FROM time_entries WHERE id = ?", (entry["id"],)).fetchone()
 
-    entry = c.fetchone()
     if not entry:
-        console.print("[red]No active time tracking session found![/red]")
+        _console().print("[red]No active time tracking session found![/red]")
         return
 
-    end_time = datetime.now()
-    start_time = datetime.fromisoformat(entry[2])
-    duration = int((end_time - start_time).total_seconds())
-
-    c.execute('''
-        UPDATE time_entries
-        SET end_time = ?, duration = ?
-        WHERE id = ?
-    ''', (end_time.isoformat(), duration, entry[0]))
-
-    conn.commit()
-    conn.close()
-
-    console.print(f"[green]Stopped time tracking. Duration: {duration} seconds[/green]")
+    duration = entry["duration"]
+    _console().print(f"[green]Stopped time tracking. Duration: {duration} seconds[/green]")
 
 @app.command()
 def stats(
@@ -285,198 +632,183 @@ def stats(
     detailed: bool = typer.Option(False, "--detailed", "-d", help="Show detailed statistics")
 ):
     """View productivity statistics and analytics."""
-    conn = sqlite3.connect(str(DB_PATH))
+    from rich.panel import Panel
+    from rich.table import Table
+
+    conn = _get_conn()
     c = conn.cursor()
 
     # Calculate time period
-    now = datetime.now()
-    if period == "day":
-        start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    elif period == "week":
-        start_date = now - timedelta(days=now.weekday())
-        start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-    elif period == "month":
-        start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    elif period == "year":
-        start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-    else:
-        console.print("[red]Invalid period. Use: day, week, month, or year[/red]")
+    since = _PERIOD_START_SQL.get(period)
+    if since is None:
+        _console().print("[red]Invalid period. Use: day, week, month, or year[/red]")
         return
 
-    # Basic statistics
-    c.execute('''
-        SELECT
-            COUNT(*) as total_tasks,
-            SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed_tasks,
-            AVG(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) * 100 as completion_rate
-        FROM tasks
-        WHERE created_at >= ?
-    ''', (start_date.isoformat(),))
-    basic_stats = c.fetchone()
-
-    # Time tracking statistics
-    c.execute('''
-        SELECT
-            COUNT(DISTINCT task_id) as tracked_tasks,
-            SUM(duration) as total_time,
-            AVG(duration) as avg_time
-        FROM time_entries
-        WHERE start_time >= ?
-    ''', (start_date.isoformat(),))
-    time_stats = c.fetchone()
-
-    # Priority-based statistics
-    c.execute('''
+    # Basic and time tracking statistics in a single statement
+    c.execute(f'''
         SELECT
-            priority,
-            COUNT(*) as total,
-            SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-            AVG(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) * 100 as completion_rate
-        FROM tasks
-        WHERE created_at >= ?
-        GROUP BY priority
-    ''', (start_date.isoformat(),))
-    priority_stats = c.fetchall()
-
-    # Most productive hours
-    c.execute('''
-        SELECT
-            strftime('%H', start_time) as hour,
-            COUNT(*) as sessions,
-            SUM(duration) as total_time
-        FROM time_entries
-        WHERE start_time >= ?
-        GROUP BY hour
-        ORDER BY total_time DESC
-        LIMIT 5
-    ''', (start_date.isoformat(),))
-    productive_hours = c.fetchall()
-
-    # Task completion trends
-    c.execute('''
-        SELECT
-            date(created_at) as date,
-            COUNT(*) as total,
-            SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed
-        FROM tasks
-        WHERE created_at >= ?
-        GROUP BY date
-        ORDER BY date
-    ''', (start_date.isoformat(),))
-    trends = c.fetchall()
+            b.total_tasks, b.completed_tasks, b.completion_rate,
+            t.tracked_tasks, t.total_time, t.avg_time
+        FROM (
+            SELECT
+                COUNT(*) as total_tasks,
+                COALESCE(SUM(status = 'completed'), 0) as completed_tasks,
+                COALESCE(100.0 * SUM(status = 'completed') / NULLIF(COUNT(*), 0), 0) as completion_rate
+            FROM tasks
+            WHERE created_at >= {since}
+        ) b, (
+            SELECT
+                COUNT(DISTINCT task_id) as tracked_tasks,
+                SUM(duration) as total_time,
+                AVG(duration) as avg_time
+            FROM time_entries
+            WHERE start_time >= {since}
+        ) t
+    ''')
+    overview = c.fetchone()
 
     # Display basic statistics
-    console.print(Panel.fit(
+    _console().print(Panel.fit(
         f"[bold]Productivity Statistics for {period.capitalize()}[/bold]\n"
-        f"Total Tasks: {basic_stats[0]}\n"
-        f"Completed Tasks: {basic_stats[1]}\n"
-        f"Completion Rate: {basic_stats[2]:.1f}%\n"
-        f"Tracked Tasks: {time_stats[0]}\n"
-        f"Total Time Spent: {timedelta(seconds=time_stats[1] or 0)}\n"
-        f"Average Time per Task: {timedelta(seconds=time_stats[2] or 0)}",
+        f"Total Tasks: {overview['total_tasks']}\n"
+        f"Completed Tasks: {overview['completed_tasks']}\n"
+        f"Completion Rate: {overview['completion_rate']:.1f}%\n"
+        f"Tracked Tasks: {overview['tracked_tasks']}\n"
+        f"Total Time Spent: {_fmt_hms(overview['total_time'])}\n"
+        f"Average Time per Task: {_fmt_hms(round(overview['avg_time'] or 0))}",
         title="Overview"
     ))
 
     if detailed:
-        # Priority-based statistics
+        # Priority breakdown and daily trends both group the same range of
+        # tasks, so read it once and return both groupings together; rows
+        # come back priority groups first, then days in order
+        c.execute(f'''
+            WITH t AS (
+                SELECT priority, status, date(created_at, 'unixepoch', 'localtime') as date
+                FROM tasks
+                WHERE created_at >= {since}
+            )
+            SELECT
+                'priority' as kind,
+                priority as bucket,
+                COUNT(*) as total,
+                SUM(status = 'completed') as completed,
+                100.0 * SUM(status = 'completed') / COUNT(*) as completion_rate
+            FROM t
+            GROUP BY priority
+            UNION ALL
+            SELECT 'date', date, COUNT(*), SUM(status = 'completed'), 100.0 * SUM(status = 'completed') / COUNT(*)
+            FROM t
+            GROUP BY date
+            ORDER BY kind DESC, bucket
+        ''')
+
         priority_table = Table(show_header=True, header_style="bold magenta")
         priority_table.add_column("Priority")
         priority_table.add_column("Total Tasks", justify="right")
         priority_table.add_column("Completed", justify="right")
         priority_table.add_column("Completion Rate", justify="right")
 
-        for stat in priority_stats:
-            priority_table.add_row(
-                stat[0] or "N/A",
-                str(stat[1]),
-                str(stat[2]),
-                f"{stat[3]:.1f}%"
+        trends_table = Table(show_header=True, header_style="bold magenta")
+        trends_table.add_column("Date")
+        trends_table.add_column("Total Tasks", justify="right")
+        trends_table.add_column("Completed", justify="right")
+        trends_table.add_column("Completion Rate", justify="right")
+
+        for stat in c:
+            table = priority_table if stat["kind"] == "priority" else trends_table
+            table.add_row(
+                stat["bucket"] or "N/A",
+                str(stat["total"]),
+                str(stat["completed"]),
+                f"{stat['completion_rate']:.1f}%"
             )
 
-        console.print("\n[bold]Priority-based Statistics[/bold]")
-        console.print(priority_table)
+        _console().print("\n[bold]Priority-based Statistics[/bold]")
+        _console().print(priority_table)
+
+        # Most productive hours, by each entry's own local hour so sessions
+        # from the other side of a DST change land where they happened
+        c.execute(f'''
+            SELECT
+                CAST(strftime('%H', start_time, 'unixepoch', 'localtime') AS INTEGER) as hour,
+                COUNT(*) as sessions,
+                SUM(duration) as total_time
+            FROM time_entries
+            WHERE start_time >= {since}
+            GROUP BY hour
+            ORDER BY total_time DESC
+            LIMIT 5
+        ''')
 
-        # Most productive hours
         hours_table = Table(show_header=True, header_style="bold magenta")
         hours_table.add_column("Hour")
         hours_table.add_column("Sessions", justify="right")
         hours_table.add_column("Total Time", justify="right")
 
-        for hour in productive_hours:
+        for hour in c:
             hours_table.add_row(
-                f"{hour[0]}:00",
-                str(hour[1]),
-                str(timedelta(seconds=hour[2]))
-            )
-
-        console.print("\n[bold]Most Productive Hours[/bold]")
-        console.print(hours_table)
-
-        # Task completion trends
-        trends_table = Table(show_header=True, header_style="bold magenta")
-        trends_table.add_column("Date")
-        trends_table.add_column("Total Tasks", justify="right")
-        trends_table.add_column("Completed", justify="right")
-        trends_table.add_column("Completion Rate", justify="right")
-
-        for trend in trends:
-            completion_rate = (trend[2] / trend[1] * 100) if trend[1] > 0 else 0
-            trends_table.add_row(
-                trend[0],
-                str(trend[1]),
-                str(trend[2]),
-                f"{completion_rate:.1f}%"
+                f"{hour['hour']:02d}:00",
+                str(hour["sessions"]),
+                _fmt_hms(hour["total_time"])
             )
 
-        console.print("\n[bold]Task Completion Trends[/bold]")
-        console.print(trends_table)
+        _console().print("\n[bold]Most Productive Hours[/bold]")
+        _console().print(hours_table)
 
-    conn.close()
+        _console().print("\n[bold]Task Completion Trends[/bold]")
+        _console().print(trends_table)
 
 @app.command()
 def pomodoro(
     minutes: int = typer.Option(25, "--minutes", "-m", help="Duration of the pomodoro session")
 ):
     """Start a pomodoro timer session."""
+    from .pomodoro import PomodoroTimer
+
     try:
         timer = PomodoroTimer()
-        console.print(f"[yellow]Starting a {minutes}-minute pomodoro session...[/yellow]")
-        console.print("[dim]Press Ctrl+C to stop the timer[/dim]")
+        _console().print(f"[yellow]Starting a {minutes}-minute pomodoro session...[/yellow]")
+        _console().print("[dim]Press Ctrl+C to stop the timer[/dim]")
         timer.start_session(minutes)
     except KeyboardInterrupt:
         timer.stop()
-        console.print("\n[red]Pomodoro session stopped by user[/red]")
+        _console().print("\n[red]Pomodoro session stopped by user[/red]")
     except Exception as e:
-        console.print(f"[red]Error: {str(e)}[/red]")
+        _console().print(f"[red]Error: {str(e)}[/red]")
 
 @app.command()
 def complete(task_id: int):
     """Mark a task as completed."""
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     c = conn.cursor()
 
-    # Check if task exists
-    c.execute("SELECT id, title, status FROM tasks WHERE id = ?", (task_id,))
-    task = c.fetchone()
-    if not task:
-        console.print(f"[red]Task with ID {task_id} not found![/red]")
-        return
+    query = f'''
+        UPDATE tasks
+        SET status = 'completed', completed_at = {_SQL_NOW}
+        WHERE id = ? AND status != 'completed'
+    '''
 
-    if task[2] == 'completed':
-        console.print(f"[yellow]Task '{task[1]}' is already completed![/yellow]")
-        return
+    with _tx(conn):
+        # Complete a pending task and read its title back in one statement
+        task = c.execute(f"{query} RETURNING title", (task_id,)).fetchone() if _HAS_RETURNING else None
 
-    # Update task status
-    c.execute('''
-        UPDATE tasks
-        SET status = 'completed', completed_at = ?
-        WHERE id = ?
-    ''', (datetime.now().isoformat(), task_id))
+        if task is None:
+            # Nothing was updated, or RETURNING is unavailable: look the task up
+            c.execute("SELECT title, status FROM tasks WHERE id = ?", (task_id,))
+            task = c.fetchone()
+            if not task:
+                _console().print(f"[red]Task with ID {task_id} not found![/red]")
+                return
 
-    conn.commit()
-    conn.close()
+            if task["status"] == 'completed':
+                _console().print(f"[yellow]Task '{task['title']}' is already completed![/yellow]")
+                return
 
-    console.print(f"[green]Task '{task[1]}' marked as completed![/green]")
+            c.execute(query, (task_id,))
+
+    _console().print(f"[green]Task '{task['title']}' marked as completed![/green]")
 
 @app.command()
 def status(
@@ -484,32 +816,33 @@ def status(
     status: str = typer.Argument(..., help="New status (pending/completed)")
 ):
     """Update task status."""
-    if status not in ["pending", "completed"]:
-        console.print("[red]Status must be one of: pending, completed[/red]")
+    if status not in _VALID_STATUSES:
+        _console().print("[red]Status must be one of: pending, completed[/red]")
         return
 
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     c = conn.cursor()
 
-    # Check if task exists
-    c.execute("SELECT id, title FROM tasks WHERE id = ?", (task_id,))
-    task = c.fetchone()
-    if not task:
-        console.print(f"[red]Task with ID {task_id} not found![/red]")
-        return
-
-    # Update task status
-    completed_at = datetime.now().isoformat() if status == 'completed' else None
-    c.execute('''
+    query = f'''
         UPDATE tasks
-        SET status = ?, completed_at = ?
-        WHERE id = ?
-    ''', (status, completed_at, task_id))
+        SET status = ?1, completed_at = CASE WHEN ?1 = 'completed' THEN {_SQL_NOW} END
+        WHERE id = ?2
+    '''
+
+    with _tx(conn):
+        if _HAS_RETURNING:
+            # Update the task and read its title back in one statement
+            task = c.execute(f"{query} RETURNING title", (status, task_id)).fetchone()
+        else:
+            task = c.execute(_SQL_TASK_TITLE, (task_id,)).fetchone()
+            if task:
+                c.execute(query, (status, task_id))
 
-    conn.commit()
-    conn.close()
+    if not task:
+        _console().print(f"[red]Task with ID {task_id} not found![/red]")
+        return
 
-    console.print(f"[green]Task '{task[1]}' status updated to {status}![/green]")
+    _console().print(f"[green]Task '{task['title']}' status updated to {status}![/green]")
 
 @app.command()
 def edit(
@@ -521,18 +854,8 @@ def edit(
     tags: Optional[str] = typer.Option(None, "--tags", "-tg", help="New task tags")
 ):
     """Edit an existing task."""
-    if priority and priority not in ["low", "medium", "high"]:
-        console.print("[red]Priority must be one of: low, medium, high[/red]")
-        return
-
-    conn = sqlite3.connect(str(DB_PATH))
-    c = conn.cursor()
-
-    # Check if task exists
-    c.execute("SELECT id, title FROM tasks WHERE id = ?", (task_id,))
-    task = c.fetchone()
-    if not task:
-        console.print(f"[red]Task with ID {task_id} not found![/red]")
+    if priority and priority not in _VALID_PRIORITIES:
+        _console().print("[red]Priority must be one of: low, medium, high[/red]")
         return
 
     # Build update query dynamically based on provided fields
@@ -549,61 +872,120 @@ def edit(
         update_fields.append("priority = ?")
         params.append(priority)
     if deadline is not None:
+        try:
+            _validate_deadline(deadline)
+        except ValueError:
+            _console().print("[red]Deadline must be an ISO date, e.g. 2024-03-20[/red]")
+            return
         update_fields.append("deadline = ?")
         params.append(deadline)
-    if tags is not None:
-        update_fields.append("tags = ?")
-        params.append(tags)
 
-    if not update_fields:
-        console.print("[yellow]No changes provided. Use --help to see available options.[/yellow]")
+    if not update_fields and tags is None:
+        _console().print("[yellow]No changes provided. Use --help to see available options.[/yellow]")
         return
 
     # Add task_id to params
     params.append(task_id)
-
-    # Execute update
     query = f'''
         UPDATE tasks
         SET {", ".join(update_fields)}
         WHERE id = ?
     '''
-    c.execute(query, params)
 
-    conn.commit()
-    conn.close()
+    conn = _get_conn()
+    c = conn.cursor()
 
-    console.print(f"[green]Task '{task[1]}' updated successfully![/green]")
+    with _tx(conn):
+        if update_fields and _HAS_RETURNING:
+            # Update the task and read its title back in one statement
+            task = c.execute(f"{query} RETURNING title", params).fetchone()
+        else:
+            task = c.execute(_SQL_TASK_TITLE, (task_id,)).fetchone()
+            if task and update_fields:
+                c.execute(query, params)
+
+        if not task:
+            _console().print(f"[red]Task with ID {task_id} not found![/red]")
+            return
+
+        # Replace the task's tag links with the new set
+        if tags is not None:
+            c.execute("DELETE FROM task_tags WHERE task_id = ?", (task_id,))
+            tag_ids = _get_or_create_tags(c, tags)
+            c.executemany(_SQL_LINK_TAG, [(task_id, tag_id) for tag_id in tag_ids])
+
+    # RETURNING reports the new title; the fallback lookup saw the old one
+    new_title = task['title'] if title is None else title
+    _console().print(f"[green]Task '{new_title}' updated successfully![/green]")
 
 @app.command()
 def delete(
-    task_id: int,
+    task_id: Optional[int] = typer.Argument(None, help="ID of the task to delete"),
+    ids: Optional[List[int]] = typer.Option(None, "--ids", "-i", help="Task IDs to delete in one batch (repeatable)"),
     force: bool = typer.Option(False, "--force", "-f", help="Force delete without confirmation")
 ):
-    """Delete a task."""
-    conn = sqlite3.connect(str(DB_PATH))
+    """Delete a task.
+
+    The task's tracked time entries are deleted with it, so that time no
+    longer shows up in time reports or exports.
+    """
+    # Merge the positional id with --ids, dropping duplicates
+    task_ids = [*dict.fromkeys(([task_id] if task_id is not None else []) + (ids or []))]
+    if not task_ids:
+        _console().print("[red]Provide a task ID or --ids.[/red]")
+        return
+
+    conn = _get_conn()
     c = conn.cursor()
 
-    # Check if task exists
-    c.execute("SELECT id, title FROM tasks WHERE id = ?", (task_id,))
-    task = c.fetchone()
-    if not task:
-        console.print(f"[red]Task with ID {task_id} not found![/red]")
+    if len(task_ids) > 1:
+        if not force and not typer.confirm(f"Are you sure you want to delete {len(task_ids)} tasks and their tracked time?"):
+            _console().print("[yellow]Task deletion cancelled.[/yellow]")
+            return
+
+        # Delete all the tasks and their time entries in one transaction
+        import json
+
+        ids_json = json.dumps(task_ids)
+        with _tx(conn):
+            c.execute("DELETE FROM time_entries WHERE task_id IN (SELECT value FROM json_each(?))", (ids_json,))
+            c.execute("DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?))", (ids_json,))
+
+        _console().print(f"[green]Deleted {c.rowcount} of {len(task_ids)} tasks.[/green]")
         return
 
+    task_id = task_ids[0]
+
+    task = None
+    if not force or not _HAS_RETURNING:
+        # Check if task exists
+        c.execute(_SQL_TASK_TITLE, (task_id,))
+        task = c.fetchone()
+        if not task:
+            _console().print(f"[red]Task with ID {task_id} not found![/red]")
+            return
+
     if not force:
         # Ask for confirmation
-        confirm = typer.confirm(f"Are you sure you want to delete task '{task[1]}'?")
+        confirm = typer.confirm(f"Are you sure you want to delete task '{task['title']}' and its tracked time?")
         if not confirm:
-            console.print("[yellow]Task deletion cancelled.[/yellow]")
+            _console().print("[yellow]Task deletion cancelled.[/yellow]")
             return
 
-    # Delete the task
-    c.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-    conn.commit()
-    conn.close()
+    # Delete the task and its time entries; tag links cascade
+    with _tx(conn):
+        c.execute("DELETE FROM time_entries WHERE task_id = ?", (task_id,))
+        if task is None:
+            # Forced delete: read the title back from the DELETE itself
+            task = c.execute("DELETE FROM tasks WHERE id = ? RETURNING title", (task_id,)).fetchone()
+        else:
+            c.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    if not task:
+        _console().print(f"[red]Task with ID {task_id} not found![/red]")
+        return
 
-    console.print(f"[green]Task '{task[1]}' deleted successfully![/green]")
+    _console().print(f"[green]Task '{task['title']}' deleted successfully![/green]")
 
 @app.command()
 def tags(
@@ -617,7 +999,9 @@ def tags(
     stats: bool = typer.Option(False, "--stats", "-s", help="Show tag statistics")
 ):
     """Manage tags."""
-    conn = sqlite3.connect(str(DB_PATH))
+    from rich.table import Table
+
+    conn = _get_conn()
     c = conn.cursor()
 
     if list_tags or not any([list_tags, create, delete, rename_id, color_id, stats]):
@@ -629,11 +1013,6 @@ def tags(
             GROUP BY t.id
             ORDER BY t.name
         ''')
-        tags = c.fetchall()
-
-        if not tags:
-            console.print("[yellow]No tags found.[/yellow]")
-            return
 
         table = Table(show_header=True, header_style="bold magenta")
         table.add_column("ID", style="dim")
@@ -641,68 +1020,74 @@ def tags(
         table.add_column("Color")
         table.add_column("Tasks", justify="right")
 
-        for tag in tags:
-            color_style = tag[2] or "dim"
+        for tag in c:
+            color_style = tag["color"] or "dim"
             table.add_row(
-                str(tag[0]),
-                f"[{color_style}]{tag[1]}[/{color_style}]",
-                tag[2] or "N/A",
-                str(tag[3])
+                str(tag["id"]),
+                f"[{color_style}]{tag['name']}[/{color_style}]",
+                tag["color"] or "N/A",
+                str(tag["task_count"])
             )
 
-        console.print(table)
+        if not table.row_count:
+            _console().print("[yellow]No tags found.[/yellow]")
+            return
+
+        _console().print(table)
 
     elif create:
         # Create new tag
         try:
-            c.execute('''
-                INSERT INTO tags (name, created_at)
-                VALUES (?, ?)
-            ''', (create, datetime.now().isoformat()))
-            conn.commit()
-            console.print(f"[green]Tag '{create}' created successfully![/green]")
+            with _tx(conn):
+                c.execute(f'''
+                    INSERT INTO tags (name, created_at)
+                    VALUES (?, {_SQL_NOW})
+                ''', (create,))
+            _console().print(f"[green]Tag '{create}' created successfully![/green]")
         except sqlite3.IntegrityError:
-            console.print(f"[red]Tag '{create}' already exists![/red]")
+            _console().print(f"[red]Tag '{create}' already exists![/red]")
 
     elif delete is not None:
         # Delete tag
-        c.execute("SELECT name FROM tags WHERE id = ?", (delete,))
+        c.execute(_SQL_TAG_NAME, (delete,))
         tag = c.fetchone()
         if not tag:
-            console.print(f"[red]Tag with ID {delete} not found![/red]")
+            _console().print(f"[red]Tag with ID {delete} not found![/red]")
             return
 
-        if typer.confirm(f"Are you sure you want to delete tag '{tag[0]}'?"):
-            c.execute("DELETE FROM tags WHERE id = ?", (delete,))
-            conn.commit()
-            console.print(f"[green]Tag '{tag[0]}' deleted successfully![/green]")
+        if typer.confirm(f"Are you sure you want to delete tag '{tag['name']}'?"):
+            with _tx(conn):
+                c.execute("DELETE FROM tags WHERE id = ?", (delete,))
+            _tag_id_cache.pop(tag["name"], None)
+            _console().print(f"[green]Tag '{tag['name']}' deleted successfully![/green]")
 
     elif rename_id is not None and rename_name is not None:
         # Rename tag
-        c.execute("SELECT name FROM tags WHERE id = ?", (rename_id,))
+        c.execute(_SQL_TAG_NAME, (rename_id,))
         tag = c.fetchone()
         if not tag:
-            console.print(f"[red]Tag with ID {rename_id} not found![/red]")
+            _console().print(f"[red]Tag with ID {rename_id} not found![/red]")
             return
 
         try:
-            c.execute("UPDATE tags SET name = ? WHERE id = ?", (rename_name, rename_id))
-            conn.commit()
-            console.print(f"[green]Tag '{tag[0]}' renamed to '{rename_name}'![/green]")
+            with _tx(conn):
+                c.execute("UPDATE tags SET name = ? WHERE id = ?", (rename_name, rename_id))
+            _tag_id_cache.pop(tag["name"], None)
+            _console().print(f"[green]Tag '{tag['name']}' renamed to '{rename_name}'![/green]")
         except sqlite3.IntegrityError:
-            console.print(f"[red]Tag '{rename_name}' already exists![/red]")
+            _console().print(f"[red]Tag '{rename_name}' already exists![/red]")
 
     elif color_id is not None and color_name is not None:
         # Set tag color
-        c.execute("SELECT name FROM tags WHERE id = ?", (color_id,))
+        c.execute(_SQL_TAG_NAME, (color_id,))
         tag = c.fetchone()
         if not tag:
-            console.print(f"[red]Tag with ID {color_id} not found![/red]")
+            _console().print(f"[red]Tag with ID {color_id} not found![/red]")
             return
 
-        c.execute("UPDATE tags SET color = ? WHERE id = ?", (color_name, color_id))
-        conn.commit()
-        console.print(f"[green]Tag '{tag[0]}' color updated to '{color_name}'![/green]")
+        with _tx(conn):
+            c.execute("UPDATE tags SET color = ? WHERE id = ?", (color_name, color_id))
+        _console().print(f"[green]Tag '{tag['name']}' color updated to '{color_name}'![/green]")
 
     elif stats:
         # Show tag statistics
@@ -719,11 +1104,6 @@ def tags(
             GROUP BY t.id
             ORDER BY task_count DESC
         ''')
-        stats = c.fetchall()
-
-        if not stats:
-            console.print("[yellow]No tag statistics available.[/yellow]")
-            return
 
         table = Table(show_header=True, header_style="bold magenta")
         table.add_column("Tag")
@@ -731,45 +1111,162 @@ def tags(
         table.add_column("Completed", justify="right")
         table.add_column("Time Spent", justify="right")
 
-        for stat in stats:
-            time_spent = timedelta(seconds=stat[3]) if stat[3] else "0:00:00"
+        for stat in c:
             table.add_row(
-                stat[0],
-                str(stat[1]),
-                str(stat[2]),
-                str(time_spent)
+                stat["name"],
+                str(stat["task_count"]),
+                str(stat["completed_tasks"]),
+                _fmt_hms(stat["total_time"])
             )
 
-        console.print(table)
+        if not table.row_count:
+            _console().print("[yellow]No tag statistics available.[/yellow]")
+            return
+
+        _console().print(table)
+
+def _fmt_hms(seconds: Optional[int]) -> str:
+    """Format whole seconds the way str(timedelta) does, without building one."""
+    minutes, secs = divmod(seconds or 0, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    days, hours = divmod(hours, 24)
+    return f"{days} day{'s' if days != 1 else ''}, {hours}:{minutes:02d}:{secs:02d}"
+
+def _format_row(task, tags) -> tuple:
+    """Return the table cells for one task row and its tag names."""
+    status = task["status"]
+    priority = task["priority"]
+    return (
+        str(task["id"]),
+        task["title"],
+        # Known values map to prebuilt markup; anything else is formatted here
+        _PRIORITY_TEXT.get(priority) or f"[dim]{priority or 'N/A'}[/dim]",
+        task["deadline"] or "N/A",
+        _STATUS_TEXT.get(status) or f"[yellow]{status}[/yellow]",
+        _tag_markup(tags),
+        task["created"],
+    )
+
+def _print_tasks(tasks, tags_by_task) -> bool:
+    """Print task rows as a table, returning False if there were none."""
+    from rich.table import Table
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("ID", style="dim")
+    table.add_column("Title")
+    table.add_column("Priority", justify="center")
+    table.add_column("Deadline", justify="center")
+    table.add_column("Status", justify="center")
+    table.add_column("Tags")
+    table.add_column("Created", justify="center")
+
+    add_row = table.add_row
+    any_row = False
+    for task in tasks:
+        any_row = True
+        add_row(*_format_row(task, tags_by_task.get(task["id"], ())))
+
+    if any_row:
+        _console().print(table)
+    return any_row
+
+def _validate_deadline(deadline: Optional[str]):
+    """Raise ValueError if a deadline is set but not a valid ISO date or datetime."""
+    if deadline:
+        datetime.fromisoformat(deadline)
 
-    conn.close()
+def _tag_markup(names) -> str:
+    """Render tag names as a comma-separated list of blue Rich markup."""
+    if not names:
+        return ""
+    return "[blue]" + "[/blue], [blue]".join(names) + "[/blue]"
 
 def _get_or_create_tags(cursor, tag_names: str) -> list:
     """Get or create tags from a comma-separated string of tag names."""
     if not tag_names:
         return []
 
-    tag_ids = []
-    for tag_name in tag_names.split(','):
-        tag_name = tag_name.strip()
-        if not tag_name:
-            continue
-
-        # Try to get existing tag
-        cursor.execute("SELECT id FROM tags WHERE name = ?", (tag_name,))
-        tag = cursor.fetchone()
-
-        if tag:
-            tag_ids.append(tag[0])
-        else:
-            # Create new tag
-            cursor.execute('''
-                INSERT INTO tags (name, created_at)
-                VALUES (?, ?)
-            ''', (tag_name, datetime.now().isoformat()))
-            tag_ids.append(cursor.lastrowid)
+    # Strip and de-duplicate the names while keeping their order
+    names = [name for name in dict.fromkeys(tag.strip() for tag in tag_names.split(',')) if name]
+    if not names:
+        return []
 
-    return tag_ids
+    # Only names not resolved earlier in this process need a lookup
+    unresolved = [name for name in names if name not in _tag_id_cache]
+    if not unresolved:
+        return [_tag_id_cache[name] for name in names]
+
+    import json
+
+    # The names go in as one JSON array so the statements don't change
+    # with the number of tags
+    unresolved_json = json.dumps(unresolved)
+    if _HAS_RETURNING:
+        # Create the missing tags and read back every id in one statement;
+        # the no-op update on conflict makes existing tags return their id too.
+        # WHERE true keeps ON CONFLICT from being parsed as a join constraint
+        cursor.execute(f'''
+            INSERT INTO tags (name, created_at)
+            SELECT value, {_SQL_NOW} FROM json_each(?) WHERE true
+            ON CONFLICT(name) DO UPDATE SET name = excluded.name
+            RETURNING id, name
+        ''', (unresolved_json,))
+        _tag_id_cache.update((name, tag_id) for tag_id, name in cursor.fetchall())
+    else:
+        # Create whichever tags are missing, then read back every id at once
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO tags (name, created_at)
+            SELECT value, {_SQL_NOW} FROM json_each(?)
+        ''', (unresolved_json,))
+        cursor.execute("SELECT id, name FROM tags WHERE name IN (SELECT value FROM json_each(?))", (unresolved_json,))
+        _tag_id_cache.update((name, tag_id) for tag_id, name in cursor.fetchall())
+
+    return [_tag_id_cache[name] for name in names]
+
+def _report_rows(since: str) -> sqlite3.Cursor:
+    """Return the time report rows for a period start expression."""
+    # Overview, per-task and per-day figures in one statement over the
+    # period's entries: the overview row sorts first, then tasks by time
+    # spent (entries without a duration last), then days in order. Periods
+    # start at local midnight, so the day rows can range over start_date
+    # and read each group in order from its index. The period start is
+    # evaluated once and shared by both filters through the bounds CTE, and the
+    # overview is rolled up from the per-task totals so the entries in range
+    # are scanned once for both
+    return _get_conn().execute(f'''
+        WITH bounds AS (
+            SELECT since, date(since, 'unixepoch', 'localtime') AS since_date
+            FROM (SELECT {since} AS since)
+        ),
+        per_task AS (
+            SELECT task_id, SUM(duration) AS total, COUNT(duration) AS timed, COUNT(*) AS sessions
+            FROM time_entries
+            WHERE start_time >= (SELECT since FROM bounds)
+            GROUP BY task_id
+        )
+        SELECT
+            'overall' as kind,
+            0 as part,
+            NULL as sort_key,
+            NULL as label,
+            COUNT(*) as tracked_tasks,
+            SUM(total) as total_time,
+            SUM(total) * 1.0 / NULLIF(SUM(timed), 0) as avg_time,
+            COALESCE(SUM(sessions), 0) as sessions
+        FROM per_task
+        UNION ALL
+        SELECT 'task', 1, COALESCE(-pt.total, 1), t.title, NULL, pt.total, NULL, pt.sessions
+        FROM per_task pt
+        JOIN tasks t ON pt.task_id = t.id
+        UNION ALL
+        SELECT 'day', 2, start_date, start_date, NULL, SUM(duration), NULL, COUNT(*)
+        FROM time_entries
+        WHERE start_date >= (SELECT since_date FROM bounds)
+        GROUP BY start_date
+        ORDER BY part, sort_key
+    ''')
 
 @app.command()
 def time(
@@ -781,27 +1278,25 @@ def time(
     period: str = typer.Option("week", "--period", "-p", help="Time period for report (day/week/month/year)")
 ):
     """Manage time tracking entries and reports."""
-    conn = sqlite3.connect(str(DB_PATH))
+    from rich.panel import Panel
+    from rich.table import Table
+
+    conn = _get_conn()
     c = conn.cursor()
 
     if list_entries or not any([list_entries, add_task_id, export, report]):
         # List time entries
-        c.execute('''
+        c.execute(f'''
             SELECT
                 te.id,
                 t.title,
-                te.start_time,
+                {_SQL_LOCAL_MINUTE.format("te.start_time")} AS started,
                 te.duration,
                 te.notes
             FROM time_entries te
             JOIN tasks t ON te.task_id = t.id
             ORDER BY te.start_time DESC
         ''')
-        entries = c.fetchall()
-
-        if not entries:
-            console.print("[yellow]No time entries found.[/yellow]")
-            return
 
         table = Table(show_header=True, header_style="bold magenta")
         table.add_column("ID", style="dim")
@@ -810,228 +1305,153 @@ def time(
         table.add_column("Duration")
         table.add_column("Notes")
 
-        for entry in entries:
-            start_time = datetime.fromisoformat(entry[2])
-            duration = timedelta(seconds=entry[3]) if entry[3] else "In Progress"
+        for entry in c:
             table.add_row(
-                str(entry[0]),
-                entry[1],
-                start_time.strftime("%Y-%m-%d %H:%M"),
-                str(duration),
-                entry[4] or ""
+                str(entry["id"]),
+                entry["title"],
+                entry["started"],
+                _fmt_hms(entry["duration"]) if entry["duration"] else "In Progress",
+                entry["notes"] or ""
             )
 
-        console.print(table)
+        if not table.row_count:
+            _console().print("[yellow]No time entries found.[/yellow]")
+            return
+
+        _console().print(table)
 
     elif add_task_id is not None and add_duration is not None:
         # Add manual time entry
         duration_seconds = add_duration * 60
 
         # Verify task exists
-        c.execute("SELECT title FROM tasks WHERE id = ?", (add_task_id,))
+        c.execute(_SQL_TASK_TITLE, (add_task_id,))
         task = c.fetchone()
         if not task:
-            console.print(f"[red]Task with ID {add_task_id} not found![/red]")
+            _console().print(f"[red]Task with ID {add_task_id} not found![/red]")
             return
 
         # Add time entry
-        c.execute('''
-            INSERT INTO time_entries (task_id, start_time, duration, notes)
-            VALUES (?, ?, ?, ?)
-        ''', (add_task_id, datetime.now().isoformat(), duration_seconds, "Manual entry"))
-        conn.commit()
+        with _tx(conn):
+            c.execute(f'''
+                INSERT INTO time_entries (task_id, start_time, start_date, end_time, duration, notes)
+                VALUES (?, {_SQL_NOW}, {_SQL_TODAY}, {_SQL_NOW}, ?, ?)
+            ''', (add_task_id, duration_seconds, "Manual entry"))
 
-        console.print(f"[green]Added {add_duration} minutes to task '{task[0]}'[/green]")
+        _console().print(f"[green]Added {add_duration} minutes to task '{task['title']}'[/green]")
 
     elif export:
+        import csv
+        from itertools import chain
+
         # Export time entries to CSV
         c.execute('''
             SELECT
                 t.title,
-                te.start_time,
+                strftime('%Y-%m-%dT%H:%M:%S', te.start_time, 'unixepoch', 'localtime') as start_time,
                 te.duration,
                 te.notes
             FROM time_entries te
             JOIN tasks t ON te.task_id = t.id
             ORDER BY te.start_time
         ''')
-        entries = c.fetchall()
-
-        if not entries:
-            console.print("[yellow]No time entries to export.[/yellow]")
+        # Peek at the first row so an empty export never creates the file
+        first = c.fetchone()
+        if first is None:
+            _console().print("[yellow]No time entries to export.[/yellow]")
             return
 
         try:
-            with open(export, 'w', newline='') as f:
+            with open(export, 'w', newline='', buffering=1 << 20) as f:
                 writer = csv.writer(f)
                 writer.writerow(['Task', 'Start Time', 'Duration (minutes)', 'Notes'])
-                for entry in entries:
-                    duration_minutes = entry[2] / 60 if entry[2] else 0
-                    writer.writerow([
-                        entry[0],
-                        entry[1],
-                        f"{duration_minutes:.1f}",
-                        entry[3] or ""
-                    ])
-            console.print(f"[green]Time entries exported to {export}[/green]")
+                # Rows go from the cursor to the writer without being collected
+                writer.writerows(
+                    (title, start_time, f"{(duration or 0) / 60:.1f}", notes or "")
+                    for title, start_time, duration, notes in chain((first,), c)
+                )
+            _console().print(f"[green]Time entries exported to {export}[/green]")
         except Exception as e:
-            console.print(f"[red]Error exporting time entries: {str(e)}[/red]")
+            _console().print(f"[red]Error exporting time entries: {str(e)}[/red]")
 
     elif report:
         # Calculate time period
-        now = datetime.now()
-        if period == "day":
-            start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        elif period == "week":
-            start_date = now - timedelta(days=now.weekday())
-            start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        elif period == "month":
-            start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        elif period == "year":
-            start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-        else:
-            console.print("[red]Invalid period. Use: day, week, month, or year[/red]")
+        since = _PERIOD_START_SQL.get(period)
+        if since is None:
+            _console().print("[red]Invalid period. Use: day, week, month, or year[/red]")
             return
 
-        # Get time tracking statistics
-        c.execute('''
-            SELECT
-                COUNT(DISTINCT task_id) as tracked_tasks,
-                SUM(duration) as total_time,
-                AVG(duration) as avg_time,
-                COUNT(*) as total_sessions
-            FROM time_entries
-            WHERE start_time >= ?
-        ''', (start_date.isoformat(),))
-        stats = c.fetchone()
-
-        # Get time by task
-        c.execute('''
-            SELECT
-                t.title,
-                COUNT(*) as sessions,
-                SUM(te.duration) as total_time
-            FROM time_entries te
-            JOIN tasks t ON te.task_id = t.id
-            WHERE te.start_time >= ?
-            GROUP BY t.id
-            ORDER BY total_time DESC
-        ''', (start_date.isoformat(),))
-        task_stats = c.fetchall()
-
-        # Get time by day
-        c.execute('''
-            SELECT
-                date(start_time) as date,
-                COUNT(*) as sessions,
-                SUM(duration) as total_time
-            FROM time_entries
-            WHERE start_time >= ?
-            GROUP BY date
-            ORDER BY date
-        ''', (start_date.isoformat(),))
-        daily_stats = c.fetchall()
+        rows = _report_rows(since)
+        stats = next(rows)
 
         # Display report
-        console.print(Panel.fit(
+        _console().print(Panel.fit(
             f"[bold]Time Tracking Report for {period.capitalize()}[/bold]\n"
-            f"Tracked Tasks: {stats[0]}\n"
-            f"Total Time: {timedelta(seconds=stats[1] or 0)}\n"
-            f"Average Session: {timedelta(seconds=stats[2] or 0)}\n"
-            f"Total Sessions: {stats[3]}",
+            f"Tracked Tasks: {stats['tracked_tasks']}\n"
+            f"Total Time: {_fmt_hms(stats['total_time'])}\n"
+            f"Average Session: {_fmt_hms(round(stats['avg_time'] or 0))}\n"
+            f"Total Sessions: {stats['sessions']}",
             title="Overview"
         ))
 
-        # Time by task
         task_table = Table(show_header=True, header_style="bold magenta")
         task_table.add_column("Task")
         task_table.add_column("Sessions", justify="right")
         task_table.add_column("Total Time", justify="right")
 
-        for stat in task_stats:
-            task_table.add_row(
-                stat[0],
-                str(stat[1]),
-                str(timedelta(seconds=stat[2]))
-            )
-
-        console.print("\n[bold]Time by Task[/bold]")
-        console.print(task_table)
-
-        # Time by day
         daily_table = Table(show_header=True, header_style="bold magenta")
         daily_table.add_column("Date")
         daily_table.add_column("Sessions", justify="right")
         daily_table.add_column("Total Time", justify="right")
 
-        for stat in daily_stats:
-            daily_table.add_row(
-                stat[0],
-                str(stat[1]),
-                str(timedelta(seconds=stat[2]))
+        for stat in rows:
+            table = task_table if stat["kind"] == "task" else daily_table
+            table.add_row(
+                stat["label"],
+                str(stat["sessions"]),
+                _fmt_hms(stat["total_time"])
             )
 
-        console.print("\n[bold]Time by Day[/bold]")
-        console.print(daily_table)
+        # Time by task
+        _console().print("\n[bold]Time by Task[/bold]")
+        _console().print(task_table)
 
-    conn.close()
+        # Time by day
+        _console().print("\n[bold]Time by Day[/bold]")
+        _console().print(daily_table)
 
 @app.command()
 #find task by keyword
 def search():
     """Search for a task by entering the keyword"""
-
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = _get_conn()
     c = conn.cursor()
 
     keyword = input('Keyword of the task:- ').strip()
-    query = "select * from tasks where title like '%s'"%('%'+keyword.lower()+'%')
-    c.execute(query)
-
-    data = c.fetchall()
-    if not data:
-        console.print(f"[yellow]No task found with keyword:- {keyword}[/yellow]")
-        return 
-    
-    table = Table(show_header=True, header_style="bold magenta")
-    table.add_column("ID", style="dim")
-    table.add_column("Title")
-    table.add_column("Priority", justify="center")
-    table.add_column("Deadline", justify="center")
-    table.add_column("Status", justify="center")
-    table.add_column("Tags")
-    table.add_column("Created", justify="center")
-
-    for task in data:
-        # Format the status with color
-        status_style = "green" if task[5] == "completed" else "yellow"
-        status_text = f"[{status_style}]{task[5]}[/{status_style}]"
-
-        # Format the priority with color
-        priority_style = {
-            "high": "red",
-            "medium": "yellow",
-            "low": "green"
-        }.get(task[3], "dim")
-        priority_text = f"[{priority_style}]{task[3] or 'N/A'}[/{priority_style}]"
-
-        # Format the creation date
-        created_at = datetime.fromisoformat(task[6])
-        created_text = created_at.strftime("%Y-%m-%d %H:%M")
-
-        # Safely access tag_names
-        tag_names = task[8] if len(task) > 8 and task[8] else ""
-        tag_text = ", ".join(f"[blue]{tag}[/blue]" for tag in tag_names.split(',') if tag)
-
-        table.add_row(
-            str(task[0]),
-            task[1],
-            priority_text,
-            task[4] or "N/A",
-            status_text,
-            tag_text,
-            created_text
-        )
 
-    console.print(table)
-    conn.close()
\ No newline at end of file
+    has_fts = c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'").fetchone()
+    if has_fts and len(keyword) >= 3:
+        # Look the keyword up in the trigram index, best matches first. It is
+        # quoted as one phrase so FTS5 operators in it are taken literally;
+        # trigrams need at least three characters, shorter keywords use LIKE
+        c.execute(f'''
+            SELECT t.id, t.title, t.priority, t.deadline, t.status,
+                {_SQL_LOCAL_MINUTE.format("t.created_at")} AS created
+            FROM tasks_fts
+            JOIN tasks t ON t.id = tasks_fts.rowid
+            WHERE tasks_fts MATCH ?
+            ORDER BY tasks_fts.rank
+        ''', ('"' + keyword.replace('"', '""') + '"',))
+    else:
+        # Bind the keyword rather than splicing it into the SQL, escaping
+        # LIKE's wildcards so they match literally; LIKE ignores ASCII case
+        pattern = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        c.execute(f'''
+            SELECT id, title, priority, deadline, status,
+                {_SQL_LOCAL_MINUTE.format("created_at")} AS created
+            FROM tasks
+            WHERE title LIKE ? ESCAPE '\\'
+        ''', (f"%{pattern}%",))
+
+    if not _print_tasks(c, {}):
+        _console().print(f"[yellow]No task found with keyword:- {keyword}[/yellow]")
@@ -1,16 +1,24 @@
+import ctypes
 import time
 import threading
 import subprocess
-from datetime import datetime, timedelta
+import shutil
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional, List
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
-import os
 
 console = Console()
 
 class PomodoroTimer:
+    # System commands that can play a notification sound, in order of preference
+    NOTIFICATION_COMMANDS = [
+        ["paplay", "/usr/share/sounds/freedesktop/stereo/complete.oga"],
+        ["paplay", "/usr/share/sounds/freedesktop/stereo/notification.oga"],
+        ["paplay", "/usr/share/sounds/ubuntu/notifications/Mallet.ogg"],
+        ["spd-say", "Time's up!"],  # Fallback to speech synthesis
+    ]
+
     def __init__(self):
         self.is_running = False
         self.current_session = 0
@@ -18,24 +26,57 @@ class PomodoroTimer:
         self.work_duration = 25  # minutes
         self.short_break_duration = 5  # minutes
         self.long_break_duration = 15  # minutes
+        self._notify_commands: Optional[List[List[str]]] = None
+        # (library, context) once libcanberra has been tried, False if unavailable
+        self._canberra = None
+        self._stopped = threading.Event()
+
+    def _available_notification_commands(self) -> List[List[str]]:
+        """Return the notification commands this system can run, found once."""
+        if self._notify_commands is None:
+            # Check for the binaries and sound files without spawning anything
+            self._notify_commands = [
+                cmd for cmd in self.NOTIFICATION_COMMANDS
+                if shutil.which(cmd[0]) and all(Path(arg).exists() for arg in cmd[1:] if arg.startswith("/"))
+            ]
+        return self._notify_commands
+
+    def _canberra_context(self):
+        """Return libcanberra and a context for playing sounds in-process, or None."""
+        if self._canberra is None:
+            self._canberra = False
+            try:
+                lib = ctypes.CDLL("libcanberra.so.0")
+                context = ctypes.c_void_p()
+                if lib.ca_context_create(ctypes.byref(context)) == 0:
+                    self._canberra = (lib, context)
+            except (OSError, AttributeError):
+                pass  # Not installed (or not Linux): use the system commands
+        return self._canberra or None
 
     def _play_notification(self):
-        """Play a notification sound using system commands."""
+        """Play a notification sound, in-process if possible, else via system commands."""
         try:
-            # Try different system commands for notification sound
-            commands = [
-                ["paplay", "/usr/share/sounds/freedesktop/stereo/complete.oga"],
-                ["paplay", "/usr/share/sounds/freedesktop/stereo/notification.oga"],
-                ["paplay", "/usr/share/sounds/ubuntu/notifications/Mallet.ogg"],
-                ["spd-say", "Time's up!"],  # Fallback to speech synthesis
-            ]
+            canberra = self._canberra_context()
+            if canberra is not None:
+                lib, context = canberra
+                # The property list is NULL-terminated; anything but 0 is an
+                # error, so fall through to the system commands
+                if lib.ca_context_play(context, 0, b"event.id", b"complete",
+                                       b"event.description", b"Time's up!", None) == 0:
+                    return
 
-            for cmd in commands:
+            commands = self._available_notification_commands()
+            while commands:
                 try:
-                    subprocess.run(cmd, check=True, capture_output=True)
+                    subprocess.run(commands[0], check=True, stdin=subprocess.DEVNULL, capture_output=True, timeout=2)
+                    break
+                except subprocess.TimeoutExpired:
+                    # Still playing a long sound when the timeout hit: that counts as played
                     break
-                except (subprocess.SubprocessError, FileNotFoundError):
-                    continue
+                except (subprocess.CalledProcessError, OSError):
+                    # It failed to play (no sound server, say): skip it from now on
+                    commands.pop(0)
         except Exception:
             pass  # Silently fail if sound can't be played
 
@@ -53,12 +94,20 @@ class PomodoroTimer:
             BarColumn(),
             TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
             TimeElapsedColumn(),
-            console=console
+            console=console,
+            # Only the spinner and elapsed time move between updates, so a
+            # few redraws a second are plenty for the refresh thread
+            refresh_per_second=4
         ) as progress:
             task = progress.add_task(message, total=duration)
-            while not progress.finished:
-                progress.update(task, advance=1)
-                time.sleep(1)
+            # Follow the monotonic clock rather than counting sleeps, so time
+            # spent redrawing doesn't add up to drift; stop() wakes the wait
+            start = time.monotonic()
+            while self.is_running:
+                elapsed = time.monotonic() - start
+                progress.update(task, completed=min(elapsed, duration))
+                if elapsed >= duration or self._stopped.wait(min(1.0, duration - elapsed)):
+                    break
 
     def start_session(self, minutes: Optional[int] = None):
         """Start a Pomodoro session."""
@@ -66,29 +115,34 @@ class PomodoroTimer:
             self.work_duration = minutes
 
         self.is_running = True
+        self._stopped.clear()
         self.current_session = 0
+        work, short_break, long_break, total = (
+            self.work_duration, self.short_break_duration, self.long_break_duration, self.total_sessions
+        )
 
-        while self.is_running and self.current_session < self.total_sessions:
+        while self.is_running and self.current_session < total:
             # Work session
             self.current_session += 1
-            console.print(f"\n[bold blue]Starting Pomodoro {self.current_session}/{self.total_sessions}[/bold blue]")
-            console.print(f"[yellow]Focus time: {self.work_duration} minutes[/yellow]")
+            console.print(f"\n[bold blue]Starting Pomodoro {self.current_session}/{total}[/bold blue]")
+            console.print(f"[yellow]Focus time: {work} minutes[/yellow]")
 
-            self._show_progress(self.work_duration * 60, "Working...")
+            self._show_progress(work * 60, "Working...")
             self._play_notification()
 
-            if self.current_session < self.total_sessions:
+            if self.current_session < total:
                 # Short break
                 console.print("\n[bold green]Time for a short break![/bold green]")
-                self._show_progress(self.short_break_duration * 60, "Short break...")
+                self._show_progress(short_break * 60, "Short break...")
                 self._play_notification()
             else:
                 # Long break after 4 sessions
                 console.print("\n[bold green]Time for a long break![/bold green]")
-                self._show_progress(self.long_break_duration * 60, "Long break...")
+                self._show_progress(long_break * 60, "Long break...")
                 self._play_notification()
                 self.current_session = 0  # Reset for next round
 
     def stop(self):
         """Stop the Pomodoro timer."""
         self.is_running = False
+        self._stopped.set()